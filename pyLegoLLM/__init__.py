@@ -11,11 +11,16 @@ __version__ = "0.1.0"
 from .ble import (
     LegoScanner,
     LegoClient,
+    connect_to_hub,
+    hub_session,
+    run_app,
     UUIDHelper,
     CHARACTERISTIC_OUTPUT_COMMAND_UUID,
     CHARACTERISTIC_INPUT_COMMAND_UUID,
     CHARACTERISTIC_PORT_TYPE_UUID,
     SENSOR_VALUE_CHARACTERISTIC_UUID,
+    WEDO_HUB_SERVICE_UUID,
+    LPF2_HUB_SERVICE_UUID,
     motor_port,
     port_devices
 )
@@ -5,14 +5,21 @@ pyLegoLLM.ble - A package for handling Bluetooth Low Energy (BLE) communication
 Provides functionality for scanning, connecting, and interacting with LEGO BLE devices.
 """
 
-from .scanner import LegoScanner
+from .scanner import LegoScanner, connect_to_hub
 from .client import LegoClient
+from .session import hub_session
+from .app import run_app
+from .write_queue import WriteQueue
 from .utils import (
     UUIDHelper,
     CHARACTERISTIC_OUTPUT_COMMAND_UUID,
     CHARACTERISTIC_INPUT_COMMAND_UUID,
     CHARACTERISTIC_PORT_TYPE_UUID,
     SENSOR_VALUE_CHARACTERISTIC_UUID,
+    WEDO_HUB_SERVICE_UUID,
+    LPF2_HUB_SERVICE_UUID,
     motor_port,
-    port_devices
+    port_devices,
+    load_cached_hub,
+    save_cached_hub_address,
 )
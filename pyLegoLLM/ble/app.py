@@ -0,0 +1,22 @@
+# pyLegoLLM/ble/app.py
+
+import logging
+from contextlib import AsyncExitStack
+from .session import hub_session
+
+log = logging.getLogger(__name__)
+
+async def run_app(handler, timeout: float = 5.0):
+    """
+    Connects to the LEGO hub (cached address first, then scanning), awaits
+    handler(client) with the connected LegoClient and disconnects once it returns.
+    The client comes from hub_session(), so handlers may open further sessions on it.
+    Returns the handler's result, or None if no hub could be reached.
+    """
+    async with AsyncExitStack() as stack:
+        try:
+            client = await stack.enter_async_context(hub_session(timeout))
+        except ConnectionError:
+            log.warning("LEGO hub not found or failed to connect. Exiting.")
+            return None
+        return await handler(client)
@@ -1,47 +1,189 @@
 # pyLegoLLM/ble/client.py
 
 import asyncio
+import logging
 from bleak import BleakClient
+from .write_queue import WriteQueue
+from .utils import (
+    CHARACTERISTIC_OUTPUT_COMMAND_UUID,
+    CHARACTERISTIC_INPUT_COMMAND_UUID,
+    CHARACTERISTIC_PORT_TYPE_UUID,
+    SENSOR_VALUE_CHARACTERISTIC_UUID,
+)
+
+log = logging.getLogger(__name__)
+
+# Default ATT MTU, used until the connection's MTU has been read.
+DEFAULT_MTU_SIZE = 23
+# Every write payload is MTU minus the 3-byte ATT header.
+ATT_HEADER_SIZE = 3
+
+# Characteristics resolved once after connecting, so later calls skip the UUID lookup.
+CACHED_CHARACTERISTIC_UUIDS = (
+    CHARACTERISTIC_OUTPUT_COMMAND_UUID,
+    CHARACTERISTIC_INPUT_COMMAND_UUID,
+    CHARACTERISTIC_PORT_TYPE_UUID,
+    SENSOR_VALUE_CHARACTERISTIC_UUID,
+)
 
 class LegoClient:
     """
     A class to manage the BLE connection and communication with the LEGO hub.
     """
-    def __init__(self, address: str):
+    __slots__ = (
+        "address", "client", "connected", "mtu_size",
+        "_chars", "_response_required", "_write_queue", "_connection_parameters",
+    )
+
+    def __init__(self, address: str, timeout: float = 10.0, flush_delay: float = 0.0,
+                 concatenate_writes: bool = False):
         self.address = address
-        self.client = BleakClient(address)
+        self.client = BleakClient(address, timeout=timeout)
         self.connected = False
+        self._chars = {}
+        self._response_required = set()   # Cached UUIDs without write-without-response.
+        self._write_queue = WriteQueue(self, flush_delay, concatenate_writes)
+        self._connection_parameters = None   # Keeps the WinRT low-latency request alive.
+        self.mtu_size = DEFAULT_MTU_SIZE
 
     async def connect(self) -> bool:
         try:
             await self.client.connect()
+            self._cache_characteristics()
+            if self._write_queue.concatenate:
+                # Only concatenated writes are sized to the MTU.
+                await self._read_mtu()
+            self._request_low_latency()
             self.connected = True
             print(f"Connected to LEGO hub at {self.address}")
             return True
         except Exception as e:
             print(f"Failed to connect to LEGO hub: {e}")
+            # Do not leave the link open when setup after connecting failed.
+            if self.client.is_connected:
+                try:
+                    await self.client.disconnect()
+                except Exception:
+                    pass
             return False
 
+    def _cache_characteristics(self):
+        """
+        Resolves the hub's known characteristics into BleakGATTCharacteristic objects
+        and notes which ones do not support write-without-response.
+        """
+        services = self.client.services
+        self._chars = {}
+        self._response_required = set()
+        for char_uuid in CACHED_CHARACTERISTIC_UUIDS:
+            char = services.get_characteristic(char_uuid)
+            if char is not None:
+                self._chars[char_uuid] = char
+                if "write-without-response" not in char.properties:
+                    self._response_required.add(char_uuid)
+
+    async def _read_mtu(self):
+        """
+        Records the MTU the OS negotiated for this connection. On BlueZ, Bleak only
+        knows it after acquiring it (_acquire_mtu, which requests nothing from the
+        hub but costs a D-Bus round trip); other backends report it directly.
+        Failures keep the default MTU. Only called when writes are concatenated.
+        """
+        acquire_mtu = getattr(self.client._backend, "_acquire_mtu", None)
+        if acquire_mtu is not None:
+            try:
+                await acquire_mtu()
+            except Exception as e:
+                log.debug("Could not acquire the MTU, using default: %s", e)
+        try:
+            self.mtu_size = self.client.mtu_size
+        except Exception:
+            self.mtu_size = DEFAULT_MTU_SIZE
+
+    def _request_low_latency(self):
+        """
+        Asks the OS for a short, throughput-optimized connection interval. Only the
+        WinRT backend (Windows 11+) exposes this; BlueZ and CoreBluetooth choose the
+        interval themselves, so there it is a no-op.
+        """
+        requester = getattr(self.client._backend, "_requester", None)
+        if requester is None:
+            return
+        try:
+            try:
+                from winrt.windows.devices.bluetooth import BluetoothLEPreferredConnectionParameters
+            except ImportError:
+                from bleak_winrt.windows.devices.bluetooth import BluetoothLEPreferredConnectionParameters
+            self._connection_parameters = requester.request_preferred_connection_parameters(
+                BluetoothLEPreferredConnectionParameters.throughput_optimized
+            )
+        except Exception as e:
+            log.debug("Low-latency connection parameters not supported: %s", e)
+
+    def max_write_size(self, char_uuid) -> int:
+        """
+        Returns the largest payload a single write-without-response can carry for the
+        characteristic: Bleak's max_write_without_response_size when the characteristic
+        has been resolved, otherwise the connection's MTU minus the ATT header.
+        """
+        char = self._chars.get(char_uuid)
+        size = getattr(char, "max_write_without_response_size", None)
+        if size:
+            return size
+        return self.mtu_size - ATT_HEADER_SIZE
+
     async def disconnect(self):
         if self.connected:
+            await self.flush()
             await self.client.disconnect()
             self.connected = False
+            self._chars = {}
+            self._response_required = set()
+            self._connection_parameters = None
             print(f"Disconnected from LEGO hub at {self.address}")
 
-    async def write_gatt_char(self, char_uuid, data):
+    async def write_gatt_char(self, char_uuid, data, response: bool = False):
         """
         Delegates the write_gatt_char call to the underlying BleakClient instance.
+        Writes are sent without response by default; pass response=True when the
+        command must be acknowledged by the hub. Characteristics that do not support
+        write-without-response always get a write with response.
         """
-        return await self.client.write_gatt_char(char_uuid, data)
+        if not response and char_uuid in self._response_required:
+            response = True
+        return await self.client.write_gatt_char(
+            self._chars.get(char_uuid, char_uuid), data, response=response
+        )
 
     async def start_notify(self, char_uuid, callback):
         """
         Delegates the start_notify call to the underlying BleakClient instance.
         """
-        return await self.client.start_notify(char_uuid, callback)
+        return await self.client.start_notify(self._chars.get(char_uuid, char_uuid), callback)
 
     async def stop_notify(self, char_uuid):
         """
         Delegates the stop_notify call to the underlying BleakClient instance.
         """
-        return await self.client.stop_notify(char_uuid)
+        return await self.client.stop_notify(self._chars.get(char_uuid, char_uuid))
+
+    def queue_write(self, char_uuid, data, on_error=None):
+        """
+        Queues a command for the given characteristic without waiting for it to be sent.
+        'on_error' is called with the command if its write fails. See WriteQueue for how
+        queued commands are elided and, optionally, concatenated.
+        """
+        self._write_queue.put(char_uuid, data, on_error)
+
+    async def write_queued(self, char_uuid, data, on_error=None):
+        """
+        Queues a command like queue_write() and waits until it has been written.
+        Raises the write's exception if it fails.
+        """
+        await self._write_queue.write(char_uuid, data, on_error)
+
+    async def flush(self):
+        """
+        Sends any queued commands immediately and waits until they have been written.
+        """
+        await self._write_queue.flush()
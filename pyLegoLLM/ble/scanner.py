@@ -2,23 +2,96 @@
 
 import asyncio
 from bleak import BleakScanner
+from .client import LegoClient
+from .utils import (
+    WEDO_HUB_SERVICE_UUID,
+    LPF2_HUB_SERVICE_UUID,
+    load_cached_hub,
+    save_cached_hub_address,
+)
 
 class LegoScanner:
     """
     A class to handle scanning and discovering LEGO WeDo 2.0 Hubs.
+    The underlying BleakScanner is created once and reused across discoveries, and only
+    reports advertisements that carry a LEGO hub service UUID.
     """
 
-    async def discover_hub(self) -> str:
+    def __init__(self):
+        self._scanner = BleakScanner(
+            detection_callback=self._detection_callback,
+            service_uuids=[WEDO_HUB_SERVICE_UUID, LPF2_HUB_SERVICE_UUID],
+        )
+        self._found = None
+        self._hub = None
+        self.hub_name = None      # Name of the hub found by the last discovery.
+
+    @staticmethod
+    def is_lego_hub(name: str) -> bool:
+        """
+        Returns True if the advertised name belongs to a LEGO WeDo 2.0 / LPF2 hub.
+        """
+        return bool(name) and ("WeDo" in name or "LPF2" in name)
+
+    def _detection_callback(self, device, advertisement_data):
+        """
+        Records the first advertisement that comes from a LEGO hub.
+        """
+        if self._found is None or self._found.is_set():
+            return
+        name = advertisement_data.local_name or device.name
+        if self.is_lego_hub(name):
+            self._hub = (name, device.address)
+            self._found.set()
+
+    async def discover_hub(self, timeout: float = 5.0) -> str:
         """
-        Scans for the LEGO WeDo 2.0 Hub using BLE.
-        Returns the hub's address if found; otherwise, returns None.
+        Scans for the LEGO WeDo 2.0 Hub using BLE and stops at the first matching
+        advertisement.
+        Returns the hub's address if found within 'timeout' seconds; otherwise, returns None.
         """
         print("Scanning for LEGO WeDo 2.0 Hub...")
         print("You can now power on the lego...")
-        devices = await BleakScanner.discover()
-        for device in devices:
-            if device.name and ("WeDo" in device.name or "LPF2" in device.name):
-                print(f"Found device: {device.name} at {device.address}")
-                return device.address
-        print("No LEGO WeDo 2.0 Hub found.")
+        self._found = asyncio.Event()
+        self._hub = None
+        await self._scanner.start()
+        try:
+            await asyncio.wait_for(self._found.wait(), timeout)
+        except asyncio.TimeoutError:
+            print("No LEGO WeDo 2.0 Hub found.")
+            return None
+        finally:
+            await self._scanner.stop()
+            self._found = None
+
+        name, address = self._hub
+        self.hub_name = name
+        print(f"Found device: {name} at {address}")
+        return address
+
+async def connect_to_hub(scanner: LegoScanner = None, timeout: float = 5.0,
+                         cached_timeout: float = 3.0, connect_timeout: float = 10.0) -> LegoClient:
+    """
+    Returns a connected LegoClient for the LEGO hub, or None if no hub could be reached.
+    The address cached by the last successful connection is tried first, without a
+    discovery scan, giving up after 'cached_timeout' seconds so a stale or powered-off
+    hub delays startup only briefly. If there is no fresh entry or the cached hub does
+    not connect, the hub is discovered by scanning for up to 'timeout' seconds and
+    connected with 'connect_timeout'. Successful connections refresh the cache.
+    """
+    cached = load_cached_hub()
+    if cached is not None:
+        client = LegoClient(cached["address"], timeout=cached_timeout)
+        if await client.connect():
+            save_cached_hub_address(cached["address"], cached.get("name"))
+            return client
+
+    scanner = scanner or LegoScanner()
+    hub_address = await scanner.discover_hub(timeout)
+    if hub_address is None:
+        return None
+    client = LegoClient(hub_address, timeout=connect_timeout)
+    if not await client.connect():
         return None
+    save_cached_hub_address(hub_address, scanner.hub_name)
+    return client
@@ -0,0 +1,80 @@
+# pyLegoLLM/ble/session.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from .scanner import connect_to_hub
+
+class _SharedHub:
+    """
+    The connection shared by all hub_session() users on one event loop.
+    'refs' counts active sessions and sessions still waiting for the lock;
+    'stale' holds dropped clients replaced by a reconnect, some of which may
+    still be in use by older sessions.
+    """
+    __slots__ = ("lock", "client", "stale", "refs")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.client = None
+        self.stale = []
+        self.refs = 0
+
+    async def close(self):
+        """
+        Disconnects the current client and every stale one.
+        """
+        clients = [self.client, *self.stale]
+        self.client = None
+        self.stale = []
+        for client in clients:
+            if client is not None:
+                await client.disconnect()
+
+# Maps running event loops to their _SharedHub; entries are dropped with the last session.
+_shared = {}
+
+def _release(loop, shared):
+    """
+    Drops one reference and forgets the loop's shared state once nobody uses it.
+    Returns True if that was the last reference.
+    """
+    shared.refs -= 1
+    if shared.refs == 0:
+        if _shared.get(loop) is shared:
+            del _shared[loop]
+        return True
+    return False
+
+@asynccontextmanager
+async def hub_session(timeout: float = 5.0):
+    """
+    Yields a connected LegoClient that is shared by every hub_session on the running
+    event loop. The first session connects (cached address first, then scanning);
+    nested or concurrent sessions reuse that client, and the last one to exit
+    disconnects it. Raises ConnectionError if no hub could be reached.
+    """
+    loop = asyncio.get_running_loop()
+    shared = _shared.get(loop)
+    if shared is None:
+        shared = _shared[loop] = _SharedHub()
+    shared.refs += 1
+    try:
+        async with shared.lock:
+            if shared.client is None or not shared.client.connected:
+                client = await connect_to_hub(timeout=timeout)
+                if client is None:
+                    raise ConnectionError("LEGO hub not found or failed to connect.")
+                if shared.client is not None:
+                    shared.stale.append(shared.client)
+                shared.client = client
+            client = shared.client
+    except BaseException:
+        if _release(loop, shared):
+            await shared.close()
+        raise
+    try:
+        yield client
+    finally:
+        async with shared.lock:
+            if _release(loop, shared):
+                await shared.close()
@@ -1,8 +1,14 @@
 # pyLegoLLM/ble/utils.py
 
+import json
+import os
+import time
+import uuid
+
 class UUIDHelper:
     UUID_CUSTOM_BASE = "1212-EFDE-1523-785FEABCD123"
     UUID_STANDARD_BASE = "0000-1000-8000-00805f9b34fb"
+    UUID_CUSTOM_BASE_LOWER = UUID_CUSTOM_BASE.lower()
 
     @staticmethod
     def add_leading_zeroes(prefix: str) -> str:
@@ -11,7 +17,7 @@ class UUIDHelper:
         """
         if prefix.startswith("0x"):
             prefix = prefix[2:]
-        return ("00000000" + prefix)[-8:]
+        return prefix.rjust(8, "0")[-8:]
 
     @staticmethod
     def uuid_with_prefix_custom_base(prefix: str) -> str:
@@ -19,13 +25,47 @@ class UUIDHelper:
         Constructs a full UUID using the custom base.
         """
         padding = UUIDHelper.add_leading_zeroes(prefix)
-        return f"{padding}-{UUIDHelper.UUID_CUSTOM_BASE.lower()}"
+        return f"{padding}-{UUIDHelper.UUID_CUSTOM_BASE_LOWER}"
+
+# Characteristic UUIDs for various commands, parsed once so Bleak does not re-parse strings.
+CHARACTERISTIC_OUTPUT_COMMAND_UUID = uuid.UUID(UUIDHelper.uuid_with_prefix_custom_base("0x1565"))
+CHARACTERISTIC_INPUT_COMMAND_UUID = uuid.UUID(UUIDHelper.uuid_with_prefix_custom_base("0x1563"))
+CHARACTERISTIC_PORT_TYPE_UUID = uuid.UUID("00001527-1212-efde-1523-785feabcd123")
+SENSOR_VALUE_CHARACTERISTIC_UUID = uuid.UUID(UUIDHelper.uuid_with_prefix_custom_base("0x1560"))
+
+# Primary services advertised by WeDo 2.0 and LPF2 (Powered Up) hubs, used to filter scans.
+WEDO_HUB_SERVICE_UUID = UUIDHelper.uuid_with_prefix_custom_base("0x1523")
+LPF2_HUB_SERVICE_UUID = "00001623-1212-efde-1623-785feabcd123"
+
+# Last connected hub, so later runs can skip scanning.
+HUB_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".pylegollm", "hub.json")
+HUB_CACHE_MAX_AGE = 24 * 60 * 60  # seconds
+
+def load_cached_hub(path: str = HUB_CACHE_PATH, max_age: float = HUB_CACHE_MAX_AGE) -> dict:
+    """
+    Returns the cached hub entry ({"address", "name", "ts"}) if it was saved less than
+    'max_age' seconds ago; otherwise, returns None.
+    """
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+        if time.time() - entry["ts"] < max_age and entry["address"]:
+            return entry
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
 
-# Characteristic UUIDs for various commands
-CHARACTERISTIC_OUTPUT_COMMAND_UUID = UUIDHelper.uuid_with_prefix_custom_base("0x1565")
-CHARACTERISTIC_INPUT_COMMAND_UUID = UUIDHelper.uuid_with_prefix_custom_base("0x1563")
-CHARACTERISTIC_PORT_TYPE_UUID = "00001527-1212-efde-1523-785feabcd123"
-SENSOR_VALUE_CHARACTERISTIC_UUID = UUIDHelper.uuid_with_prefix_custom_base("0x1560")
+def save_cached_hub_address(address: str, name: str = None, path: str = HUB_CACHE_PATH):
+    """
+    Stores the hub address with the current time. Failures are ignored; the cache is
+    only an optimization.
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"address": address, "name": name, "ts": time.time()}, f)
+    except OSError:
+        pass
 
 # Global variables for device management (if needed in the future)
 motor_port = None
@@ -0,0 +1,135 @@
+# pyLegoLLM/ble/write_queue.py
+
+import asyncio
+import logging
+
+log = logging.getLogger(__name__)
+
+class WriteQueue:
+    """
+    Buffers commands for a LegoClient and writes them from a single consumer task,
+    one write in flight at a time. put() is fire-and-forget; write() waits until the
+    command (or the newer one that replaced it) has been written.
+
+    Only the latest command per (port, command) is kept, so a newer LED color or
+    motor power replaces one still waiting in the buffer and the buffer never holds
+    more than one command per endpoint. Commands queued within the same event-loop
+    tick are flushed together; a non-zero 'flush_delay' widens that window to
+    'flush_delay' seconds, so more superseded commands are dropped.
+
+    Each command is sent as its own write-without-response. With 'concatenate' set,
+    the commands of one flush are instead packed into as few writes as the MTU
+    allows; only enable it for hub firmware known to parse several commands per write.
+
+    A failed write is logged and reported to the 'on_error' callback of every
+    command it carried, so callers can forget state they recorded when queueing,
+    and raised to every write() waiting on it.
+    """
+    __slots__ = ("client", "flush_delay", "concatenate", "_pending", "_flush_handle", "_drain_task")
+
+    def __init__(self, client, flush_delay: float = 0.0, concatenate: bool = False):
+        """
+        Initializes the queue for the given LegoClient.
+        """
+        self.client = client
+        self.flush_delay = flush_delay
+        self.concatenate = concatenate
+        self._pending = {}          # Maps characteristic UUIDs to {(port, command): (bytes, on_error, waiters)}.
+        self._flush_handle = None
+        self._drain_task = None
+
+    def put(self, char_uuid, data, on_error=None, waiter=None):
+        """
+        Queues a command, replacing any pending command for the same (port, command).
+        'on_error', if given, is called with the command if writing it fails. Waiters of
+        a replaced command move to the new one, so they complete with its write.
+        """
+        pending = self._pending.get(char_uuid)
+        if pending is None:
+            pending = self._pending[char_uuid] = {}
+        key = data[0], data[1]
+        replaced = pending.get(key)
+        waiters = replaced[2] if replaced is not None else []
+        if waiter is not None:
+            waiters.append(waiter)
+        pending[key] = (bytes(data), on_error, waiters)
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.flush_delay > 0:
+                self._flush_handle = loop.call_later(self.flush_delay, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+
+    async def write(self, char_uuid, data, on_error=None):
+        """
+        Queues a command like put() and waits until it has been written.
+        Raises the write's exception if it fails.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self.put(char_uuid, data, on_error, waiter)
+        await waiter
+
+    def _flush(self):
+        """
+        Starts the consumer task unless it is already running.
+        """
+        self._flush_handle = None
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = asyncio.ensure_future(self._drain())
+
+    async def _drain(self):
+        """
+        Writes queued commands until the buffer is empty, picking up anything
+        queued while a previous write was in flight.
+        """
+        while self._pending:
+            pending, self._pending = self._pending, {}
+            for char_uuid, commands in pending.items():
+                if self.concatenate:
+                    batches = self._pack_batches(commands.values(), self.client.max_write_size(char_uuid))
+                else:
+                    batches = ([entry] for entry in commands.values())
+                for batch in batches:
+                    payload = b"".join(entry[0] for entry in batch)
+                    try:
+                        await self.client.write_gatt_char(char_uuid, payload, response=False)
+                    except Exception as e:
+                        log.warning("Failed to write queued command to LEGO hub: %s", e)
+                        for command, on_error, waiters in batch:
+                            if on_error is not None:
+                                on_error(command)
+                            for waiter in waiters:
+                                if not waiter.done():
+                                    waiter.set_exception(e)
+                    else:
+                        for _, _, waiters in batch:
+                            for waiter in waiters:
+                                if not waiter.done():
+                                    waiter.set_result(None)
+
+    @staticmethod
+    def _pack_batches(entries, max_size: int):
+        """
+        Groups queued (command, on_error, waiters) entries into batches whose commands add up
+        to no more than 'max_size' bytes, never splitting a single command across writes.
+        """
+        batch = []
+        size = 0
+        for entry in entries:
+            if batch and size + len(entry[0]) > max_size:
+                yield batch
+                batch = []
+                size = 0
+            batch.append(entry)
+            size += len(entry[0])
+        if batch:
+            yield batch
+
+    async def flush(self):
+        """
+        Sends any queued commands immediately and waits until they have been written.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush()
+        await self._drain_task
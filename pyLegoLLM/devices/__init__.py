@@ -4,6 +4,12 @@ pyLegoLLM.devices - A subpackage for managing LEGO devices like motors and LEDs.
 
 # Expose the Motor and LED classes at the package level
 from .motor import Motor
-from .led import LED
 
-__all__ = ["Motor", "LED"]  # Optional: Defines what gets imported with `from devices import *`
\ No newline at end of file
+__all__ = ["Motor", "LED"]  # Optional: Defines what gets imported with `from devices import *`
+
+def __getattr__(name):
+    # LED is imported on first use, so importing Motor does not load the LED module.
+    if name == "LED":
+        from .led import LED
+        return LED
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,28 @@
 # pyLegoLLM/devices/led.py
 
 import asyncio
+import itertools
+import logging
 from pyLegoLLM.ble.utils import CHARACTERISTIC_OUTPUT_COMMAND_UUID
 
+log = logging.getLogger(__name__)
+
+# LED command header: [port 0x06, command 0x04 (RGB), payload length 0x03].
+_LED_HDR = b"\x06\x04\x03"
+
+# LED commands cycled through by LED.disco.
+_DISCO_FRAMES = (
+    _LED_HDR + bytes((0, 0, 255)),    # Blue
+    _LED_HDR + bytes((255, 0, 0)),    # Red
+    _LED_HDR + bytes((0, 255, 0)),    # Green
+    _LED_HDR + bytes((128, 0, 128))   # Purple
+)
+
 class LED:
     """
     Represents a static LED device. Provides methods to set color, blink, or run in disco mode.
     """
+    __slots__ = ("client", "_mode_task", "_mode_done", "_last_command")
     
     # Predefined main 8 colors (can be adjusted as needed)
     PREDEFINED_COLORS = {
@@ -20,41 +36,81 @@ class LED:
         'black': (0, 0, 0)
     }
 
+    # Full LED command payloads for the predefined colors, built once.
+    PREDEFINED_COMMANDS = {
+        name: _LED_HDR + bytes((red, green, blue))
+        for name, (red, green, blue) in PREDEFINED_COLORS.items()
+    }
+    LED_OFF = PREDEFINED_COMMANDS['black']
+
     def __init__(self, client):
         """
         Initializes the LED with the given BLE client.
         """
         self.client = client
-        self._mode_task = None
+        self._mode_task = None   # Running disco task or pending blink timer handle.
+        self._mode_done = None   # Future awaited by blink until it finishes.
+        self._last_command = None   # Last LED command queued, to skip identical writes; cleared if its write fails.
+
+    def _record_command(self, command: bytes, force: bool) -> bool:
+        """
+        Records 'command' as the LED's current command. Returns False, so the command
+        is skipped, if it matches the last one sent and 'force' is not set.
+        """
+        if command == self._last_command and not force:
+            return False
+        self._last_command = command
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sending LED color command: %s", command.hex())
+        return True
+
+    def _send_led_command(self, command: bytes, force: bool = False):
+        """
+        Queues a prebuilt LED command in the format: [0x06, 0x04, 0x03, R, G, B]
+        without waiting for it to be written (used by the blink and disco timers).
+        The command is skipped if it matches the last one sent, unless 'force' is True.
+        """
+        if self._record_command(command, force):
+            self.client.queue_write(CHARACTERISTIC_OUTPUT_COMMAND_UUID, command, self._write_failed)
+
+    async def _write_led_command(self, command: bytes, force: bool = False):
+        """
+        Like _send_led_command, but waits until the command has been written and
+        raises the write's exception if it fails.
+        """
+        if self._record_command(command, force):
+            await self.client.write_queued(CHARACTERISTIC_OUTPUT_COMMAND_UUID, command, self._write_failed)
 
-    async def _send_led_color(self, red: int, green: int, blue: int):
+    def _write_failed(self, command: bytes):
         """
-        Sends an LED command in the format: [0x06, 0x04, 0x03, R, G, B]
+        Forgets a command the hub never received, so repeating it is not skipped.
         """
-        command = bytearray([0x06, 0x04, 0x03, red, green, blue])
-        print(f"Sending LED color command: {list(command)}")
-        await self.client.write_gatt_char(CHARACTERISTIC_OUTPUT_COMMAND_UUID, command)
-        print(f"LED color command sent: R={red}, G={green}, B={blue}")
+        if command == self._last_command:
+            self._last_command = None
 
-    async def set_color_rgb(self, red: int, green: int, blue: int):
+    async def set_color_rgb(self, red: int, green: int, blue: int, force: bool = False):
         """
         Sets the LED color using RGB values.
         Cancels any running mode (blink/disco) before setting the color.
+        Setting the color the LED already has is a no-op unless 'force' is True
+        (e.g. to restore the color after reconnecting).
+        Returns once the command has been written; raises if the write fails.
         """
         self.stop_mode()
-        await self._send_led_color(red, green, blue)
+        await self._write_led_command(_LED_HDR + bytes((red, green, blue)), force)
 
-    async def set_color(self, color: str):
+    async def set_color(self, color: str, force: bool = False):
         """
         Sets the LED to one of the predefined colors.
+        Setting the color the LED already has is a no-op unless 'force' is True.
+        Returns once the command has been written; raises if the write fails.
         """
         self.stop_mode()
-        color_lower = color.lower()
-        if color_lower not in self.PREDEFINED_COLORS:
-            print(f"Color '{color}' not defined. Available colors: {list(self.PREDEFINED_COLORS.keys())}")
+        command = self.PREDEFINED_COMMANDS.get(color.lower())
+        if command is None:
+            log.warning("Color '%s' not defined. Available colors: %s", color, list(self.PREDEFINED_COLORS))
             return
-        red, green, blue = self.PREDEFINED_COLORS[color_lower]
-        await self._send_led_color(red, green, blue)
+        await self._write_led_command(command, force)
 
     async def blink(self, color: str, duration: float):
         """
@@ -62,28 +118,41 @@ class LED:
         then leaves the LED in the specified color.
         """
         self.stop_mode()
-        color_lower = color.lower()
-        if color_lower not in self.PREDEFINED_COLORS:
-            print(f"Color '{color}' not defined. Available colors: {list(self.PREDEFINED_COLORS.keys())}")
+        command = self.PREDEFINED_COMMANDS.get(color.lower())
+        if command is None:
+            log.warning("Color '%s' not defined. Available colors: %s", color, list(self.PREDEFINED_COLORS))
             return
 
-        red, green, blue = self.PREDEFINED_COLORS[color_lower]
+        loop = asyncio.get_running_loop()
+        end_time = loop.time() + duration
+        done = loop.create_future()
 
-        async def blink_task():
-            end_time = asyncio.get_event_loop().time() + duration
-            toggle = True
-            while asyncio.get_event_loop().time() < end_time:
-                if toggle:
-                    await self._send_led_color(red, green, blue)
-                else:
-                    await self._send_led_color(0, 0, 0)  # turn off
-                toggle = not toggle
-                await asyncio.sleep(0.5)
-            # After blinking, leave the LED on with the specified color.
-            await self._send_led_color(red, green, blue)
+        def tick(deadline: float, toggle: bool):
+            if deadline >= end_time:
+                # After blinking, leave the LED on with the specified color.
+                self._send_led_command(command)
+                self._mode_task = None
+                self._mode_done = None
+                if not done.done():
+                    done.set_result(None)
+                return
+            if toggle:
+                self._send_led_command(command)
+            else:
+                self._send_led_command(self.LED_OFF)  # turn off
+            deadline += 0.5
+            self._mode_task = loop.call_at(deadline, tick, deadline, not toggle)
 
-        self._mode_task = asyncio.create_task(blink_task())
-        await self._mode_task
+        self._mode_done = done
+        tick(loop.time(), True)
+        try:
+            await done
+        except asyncio.CancelledError:
+            # Cancelling the caller must also stop the timer chain, unless another
+            # mode has already replaced it (stop_mode cancels 'done' as well).
+            if self._mode_done is done:
+                self.stop_mode()
+            raise
 
     async def disco(self):
         """
@@ -93,19 +162,13 @@ class LED:
         self.stop_mode()
 
         async def disco_task():
-            colors = [
-                (0, 0, 255),    # Blue
-                (255, 0, 0),    # Red
-                (0, 255, 0),    # Green
-                (128, 0, 128)   # Purple
-            ]
-            index = 0
-            while True:
-                red, green, blue = colors[index % len(colors)]
-                print(f"Disco mode: Setting LED color to R={red}, G={green}, B={blue}")
-                await self._send_led_color(red, green, blue)
-                await asyncio.sleep(2)
-                index += 1
+            # Sleep until fixed deadlines so write latency does not add up across cycles.
+            loop = asyncio.get_running_loop()
+            deadline = loop.time()
+            for command in itertools.cycle(_DISCO_FRAMES):
+                self._send_led_command(command)
+                deadline += 2
+                await asyncio.sleep(max(0, deadline - loop.time()))
 
         self._mode_task = asyncio.create_task(disco_task())
 
@@ -116,3 +179,6 @@ class LED:
         if self._mode_task is not None:
             self._mode_task.cancel()
             self._mode_task = None
+        if self._mode_done is not None:
+            self._mode_done.cancel()
+            self._mode_done = None
@@ -1,13 +1,29 @@
 # pyLegoLLM/devices/motor.py
 
 import asyncio
+import logging
+import struct
+import time
 from pyLegoLLM.ble.utils import CHARACTERISTIC_INPUT_COMMAND_UUID, CHARACTERISTIC_OUTPUT_COMMAND_UUID
 
+log = logging.getLogger(__name__)
+
+_INIT_PACK = struct.Struct("<11B").pack
+_MOTOR_PACK = struct.Struct("<BBBB").pack
+
 class Motor:
     """
     Represents a LEGO motor. Once initialized by the Manager upon detection,
     commands can be sent to control the motor.
     """
+    __slots__ = (
+        "client", "port", "connected_device", "mode", "value_format",
+        "_last_value", "_last_send",
+    )
+
+    # An unchanged power is re-sent at most this often (seconds) as a safety refresh.
+    REFRESH_INTERVAL = 2.0
+
     def __init__(self, client, port: int, connected_device: int = 1, mode: int = 0x02, value_format: int = 0x00):
         """
         Initializes the Motor instance with the BLE client and port parameters.
@@ -17,13 +33,15 @@ class Motor:
         self.connected_device = connected_device
         self.mode = mode
         self.value_format = value_format
+        self._last_value = None       # Last motor value queued for this port; cleared if its write fails.
+        self._last_send = 0.0         # time.monotonic() of that write.
 
     async def initialize(self):
         """
         Sends an 11-byte handshake command to initialize the motor port.
         Command: [0x01, 0x02, port, connected_device, mode, 0x01, 0x00, 0x00, 0x00, value_format, 0x01]
         """
-        command = bytearray([
+        command = _INIT_PACK(
             0x01, 0x02,
             self.port,
             self.connected_device,
@@ -31,10 +49,10 @@ class Motor:
             0x01, 0x00, 0x00, 0x00,
             self.value_format,
             0x01
-        ])
-        print(f"Initializing motor port {self.port} with command: {list(command)}")
-        await self.client.write_gatt_char(CHARACTERISTIC_INPUT_COMMAND_UUID, command)
-        print("Motor port initialized.")
+        )
+        log.info("Initializing motor port %d with command: %s", self.port, command.hex())
+        await self.client.write_gatt_char(CHARACTERISTIC_INPUT_COMMAND_UUID, command, response=True)
+        log.info("Motor port initialized.")
 
     @staticmethod
     def calculate_motor_power(power: int) -> int:
@@ -43,28 +61,43 @@ class Motor:
           - For positive speeds, send the percentage (1–100).
           - For negative speeds, send (256 + power) (e.g. -50 becomes 206).
           - 0 stops the motor.
+        This is the power as an 8-bit two's complement value, i.e. power & 0xFF.
         """
-        if power > 0:
-            return power
-        elif power < 0:
-            return 256 + power
-        else:
-            return 0
+        assert -128 <= power <= 127, f"motor power {power} does not fit in a signed byte"
+        return power & 0xFF
 
     @staticmethod
-    def write_motor_power_command(motor_value: int, port: int) -> bytearray:
+    def write_motor_power_command(motor_value: int, port: int) -> bytes:
         """
         Constructs a 4-byte motor command.
         For a WeDo 2.0 motor, the expected command is:
           [port, 0x01, 0x01, motor_value]
         """
-        return bytearray([port, 0x01, 0x01, motor_value])
+        return _MOTOR_PACK(port, 0x01, 0x01, motor_value)
+
+    async def send_command(self, power: int, force: bool = False):
+        """
+        Queues a motor command to control the motor power and waits until it has
+        been written (a newer power queued meanwhile replaces it); raises if the write fails.
+        The hub keeps the last power until it is changed, so repeating the current
+        power is skipped unless REFRESH_INTERVAL seconds have passed since it was sent,
+        or 'force' is True (e.g. to restore the power after reconnecting).
+        """
+        assert -128 <= power <= 127, f"motor power {power} does not fit in a signed byte"
+        motor_value = power & 0xFF  # Same as calculate_motor_power, without the call.
+        now = time.monotonic()
+        if (motor_value == self._last_value and now - self._last_send < self.REFRESH_INTERVAL
+                and not force):
+            return
+        self._last_value = motor_value
+        self._last_send = now
+        command = _MOTOR_PACK(self.port, 0x01, 0x01, motor_value)
+        log.debug("Motor command queued: port=%d, desired power=%d mapped to %d", self.port, power, motor_value)
+        await self.client.write_queued(CHARACTERISTIC_OUTPUT_COMMAND_UUID, command, self._write_failed)
 
-    async def send_command(self, power: int):
+    def _write_failed(self, command: bytes):
         """
-        Sends a motor command to control the motor power.
+        Forgets a motor value the hub never received, so repeating it is not skipped.
         """
-        motor_value = self.calculate_motor_power(power)
-        command = self.write_motor_power_command(motor_value, self.port)
-        await self.client.write_gatt_char(CHARACTERISTIC_OUTPUT_COMMAND_UUID, command)
-        print(f"Motor command sent: port={self.port}, desired power={power} mapped to {motor_value}")
+        if command[3] == self._last_value:
+            self._last_value = None
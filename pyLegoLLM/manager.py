@@ -1,17 +1,31 @@
 # pyLegoLLM/manager.py
 
 import asyncio
+import logging
+import struct
 from pyLegoLLM.ble.utils import (
     CHARACTERISTIC_PORT_TYPE_UUID,
     SENSOR_VALUE_CHARACTERISTIC_UUID,
 )
 
+log = logging.getLogger(__name__)
+
+# Port notification: (port_id, is_connected, device_type); byte 2 is unused.
+_PORT_HDR = struct.Struct("<BBxB").unpack_from
+# Sensor notification: (message_type, port_id); at least 4 bytes are required.
+_SENSOR_HDR = struct.Struct("<BBxx").unpack_from
+
 class Manager:
     """
     The main controller that manages devices, monitors ports, and coordinates tasks.
     It listens for port notifications to detect connected devices (like motors)
     and sensor notifications to process sensor data.
     """
+    __slots__ = (
+        "client", "motor_port", "port_devices", "initialized_ports",
+        "_stop", "_last_port_state", "_motor_detected", "_notifications", "_consumer",
+    )
+
     def __init__(self, client):
         """
         Initializes the Manager with a connected BLE client.
@@ -20,69 +34,143 @@ class Manager:
         self.motor_port = None
         self.port_devices = {}        # Maps port IDs to device types.
         self.initialized_ports = {}   # Tracks sensor initialization per port.
+        self._stop = asyncio.Event()  # Set by stop() to end the monitoring tasks.
+        self._last_port_state = {}    # Maps port IDs to the last (is_connected, device_type).
+        self._motor_detected = asyncio.Event()  # Set once a motor port is known.
+        self._notifications = asyncio.Queue()   # (handler, sender, data) waiting to be processed.
+        self._consumer = None
 
     def port_notification_handler(self, sender, data):
         """
         Callback for port notifications.
-        Updates port_devices if needed.
+        Updates port_devices if needed; repeated notifications for an unchanged port are ignored.
         """
-        if len(data) >= 4:
-            port_id = data[0]
-            is_connected = data[1]
-            device_type = data[3]
-            print(f"[Port Notification] Port: {port_id}, Connected: {is_connected}, Device Type: {device_type}")
-            self.port_devices[port_id] = device_type
+        try:
+            port_id, is_connected, device_type = _PORT_HDR(data)
+        except struct.error:
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("[Port Notification] Incomplete data: %s", data.hex())
+            return
+        state = (is_connected, device_type)
+        if self._last_port_state.get(port_id) == state:
+            return
+        self._last_port_state[port_id] = state
+        log.debug("[Port Notification] Port: %d, Connected: %d, Device Type: %d", port_id, is_connected, device_type)
+        self.port_devices[port_id] = device_type
+        log.info("[Port Devices] %s", self.port_devices)
 
-            # Detect motor (device type 1)
-            if is_connected == 1 and device_type == 1:
-                if self.motor_port != port_id:
-                    self.motor_port = port_id
-                    print(f"Detected motor on port {self.motor_port}.")
+        # Detect motor (device type 1)
+        if is_connected == 1 and device_type == 1:
+            if self.motor_port != port_id:
+                self.motor_port = port_id
+                log.info("Detected motor on port %d.", self.motor_port)
+                self._motor_detected.set()
 
-        else:
-            print(f"[Port Notification] Incomplete data: {list(data)}")
+    async def wait_for_motor(self) -> int:
+        """
+        Waits until a motor has been detected by the port notifications and returns its port.
+        """
+        await self._motor_detected.wait()
+        return self.motor_port
 
     async def monitor_ports(self):
         """
-        Subscribes to port type notifications and continuously monitors ports.
+        Subscribes to port type notifications and monitors ports until stop() is called.
         """
-        await self.client.start_notify(CHARACTERISTIC_PORT_TYPE_UUID, self.port_notification_handler)
-        print("Started monitoring port notifications.")
-        while True:
-            print(f"[Port Devices] {self.port_devices}")
-            print(f"[Initialized Ports] {self.initialized_ports}")
-            await asyncio.sleep(10)
+        await self._subscribe(CHARACTERISTIC_PORT_TYPE_UUID, self.port_notification_handler)
+        log.info("Started monitoring port notifications.")
+        await self._stop.wait()
+        await self._unsubscribe(CHARACTERISTIC_PORT_TYPE_UUID)
 
     def sensor_notification_handler(self, sender, data):
         """
         Callback for sensor notifications.
-        For now just prints notifications.
+        For now just logs notifications.
         TODO: Process sensor data.
         """
-        print(f"[Sensor Notification] Raw data ({len(data)} bytes): {list(data)}")
-        if len(data) < 4:
-            print("[Sensor Notification] Data length less than expected (4 bytes required).")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("[Sensor Notification] Raw data (%d bytes): %s", len(data), data.hex())
+        try:
+            message_type, port_id = _SENSOR_HDR(data)
+        except struct.error:
+            log.debug("[Sensor Notification] Data length less than expected (4 bytes required).")
             return
-        port_id = data[1]
-        message_type = data[0]
-        print(f"[Sensor Notification] Message Type: {message_type}, Port ID: {port_id}")
+        log.debug("[Sensor Notification] Message Type: %d, Port ID: %d", message_type, port_id)
         device_type = self.port_devices.get(port_id)
-        print(f"[Sensor Notification] Device type for port {port_id}: {device_type}")
+        log.debug("[Sensor Notification] Device type for port %d: %s", port_id, device_type)
 
     async def monitor_sensor_values(self):
         """
-        Subscribes to sensor value notifications and continuously monitors sensor data.
+        Subscribes to sensor value notifications and monitors sensor data until stop() is called.
+        """
+        await self._subscribe(SENSOR_VALUE_CHARACTERISTIC_UUID, self.sensor_notification_handler)
+        log.info("Started monitoring sensor values.")
+        await self._stop.wait()
+        await self._unsubscribe(SENSOR_VALUE_CHARACTERISTIC_UUID)
+
+    async def _subscribe(self, char_uuid, handler):
+        """
+        Subscribes to notifications on 'char_uuid' with a callback that only copies
+        the payload and hands it to the event loop; 'handler' then runs in the
+        notification consumer task. Bleak may invoke callbacks off the loop thread,
+        so the hand-off goes through call_soon_threadsafe.
+        """
+        loop = asyncio.get_running_loop()
+        put = self._notifications.put_nowait
+        if self._consumer is None or self._consumer.done():
+            self._consumer = asyncio.ensure_future(self._process_notifications())
+
+        def callback(sender, data):
+            loop.call_soon_threadsafe(put, (handler, sender, bytes(data)))
+
+        await self.client.start_notify(char_uuid, callback)
+
+    async def _unsubscribe(self, char_uuid):
+        """
+        Stops notifications on 'char_uuid', ignoring failures (e.g. the hub already disconnected).
+        """
+        try:
+            await self.client.stop_notify(char_uuid)
+        except Exception as e:
+            log.debug("Failed to stop notifications for %s: %s", char_uuid, e)
+
+    async def _process_notifications(self):
+        """
+        Dispatches queued notifications to their handlers, one at a time and in arrival order.
         """
-        await self.client.start_notify(SENSOR_VALUE_CHARACTERISTIC_UUID, self.sensor_notification_handler)
-        print("Started monitoring sensor values.")
         while True:
-            await asyncio.sleep(10)
+            handler, sender, data = await self._notifications.get()
+            try:
+                handler(sender, data)
+            except Exception:
+                log.exception("Notification handler %s failed", handler.__name__)
 
-    async def run(self):
+    async def run(self, eager_tasks: bool = False):
         """
         Runs the manager by concurrently monitoring ports and sensor values.
+        With 'eager_tasks', the loop uses the eager task factory (Python 3.12+) while
+        the manager runs, so tasks that finish without yielding run inline instead of
+        taking a round trip through the scheduler. This changes task ordering for all
+        code on the loop, so it is opt-in; the previous factory is restored on exit.
+        """
+        loop = asyncio.get_running_loop()
+        previous_factory = loop.get_task_factory()
+        if eager_tasks and hasattr(asyncio, "eager_task_factory"):
+            loop.set_task_factory(asyncio.eager_task_factory)
+        try:
+            await asyncio.gather(
+                self.monitor_ports(),
+                self.monitor_sensor_values()
+            )
+        finally:
+            loop.set_task_factory(previous_factory)
+
+    async def stop(self):
+        """
+        Stops the monitoring tasks started by run(); each one unsubscribes from its
+        notifications on the way out.
         """
-        await asyncio.gather(
-            self.monitor_ports(),
-            self.monitor_sensor_values()
-        )
+        self._stop.set()
+        if self._consumer is not None:
+            self._consumer.cancel()
+            self._consumer = None
@@ -10,6 +10,10 @@ setup(
     install_requires=[
         "bleak",  # Add any dependencies your package requires
     ],
+    extras_require={
+        # Faster event loop for applications that opt in (see sample_app.py).
+        "uvloop": ['uvloop>=0.18; platform_system != "Windows"'],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
@@ -1,10 +1,11 @@
 # sample_app.py
 
 import asyncio
-from pyLegoLLM.ble import LegoScanner, LegoClient
+import logging
+import signal
+from pyLegoLLM.ble import run_app
 from pyLegoLLM.manager import Manager
 from pyLegoLLM.devices.motor import Motor
-from pyLegoLLM.devices.led import LED
 
 async def motor_command_routine(manager, client):
     """
@@ -13,12 +14,11 @@ async def motor_command_routine(manager, client):
     then after 5 seconds sends a command of -50.
     """
     print("Waiting for motor detection...")
-    # Poll for the motor_port in the manager (set by port notifications)
-    while manager.motor_port is None:
-        await asyncio.sleep(1)
+    # Wait for the manager to detect a motor (set by port notifications)
+    motor_port = await manager.wait_for_motor()
 
     # Motor detected; create and initialize the Motor instance.
-    motor = Motor(client, manager.motor_port)
+    motor = Motor(client, motor_port)
     await motor.initialize()
     
     # Send motor command with power 50.
@@ -39,7 +39,10 @@ async def led_demo(client):
       2. Sets LED to an RGB green.
       3. Blinks LED with blue for 5 seconds.
       4. Enters disco mode for 6 seconds, then stops and sets LED to white.
+    Not run by main(); LED is imported here so the default run does not need it.
     """
+    from pyLegoLLM.devices.led import LED
+
     led = LED(client)
     
     print("Setting LED to predefined red...")
@@ -63,30 +66,49 @@ async def led_demo(client):
     await led.set_color("white")
     await asyncio.sleep(3)
 
-async def main():
-    scanner = LegoScanner()
-    hub_address = await scanner.discover_hub()
-    if hub_address is None:
-        print("LEGO hub not found. Exiting.")
-        return
+async def hub_routine(client):
+    """
+    Runs the manager in the background and the motor routine on the connected hub.
+    """
+    # Initialize the Manager with the connected client.
+    manager = Manager(client)
+
+    # Run the manager's monitoring tasks concurrently in the background.
+    manager_task = asyncio.create_task(manager.run(eager_tasks=True))
+
+    # Run the motor routine (add led_demo(client) here to exercise the LED as well).
+    motor_task = asyncio.create_task(motor_command_routine(manager, client))
 
-    client = LegoClient(hub_address)
-    if await client.connect():
-        # Initialize the Manager with the connected client.
-        manager = Manager(client)
-        
-        # Run the manager's monitoring tasks concurrently in the background.
-        manager_task = asyncio.create_task(manager.run())
-        
-        # Run both motor and LED routines concurrently.
-        motor_task = asyncio.create_task(motor_command_routine(manager, client))
-        
+    # On Ctrl+C, cancel the routine so the manager and connection shut down cleanly.
+    # add_signal_handler is not available on Windows; there Ctrl+C raises KeyboardInterrupt.
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, motor_task.cancel)
+        sigint_handled = True
+    except NotImplementedError:
+        sigint_handled = False
+
+    try:
         await asyncio.gather(motor_task)
-        
-        # Optionally, cancel the manager task after routines complete.
-        manager_task.cancel()
-    else:
-        print("Failed to connect to the LEGO hub.")
+    except asyncio.CancelledError:
+        print("Interrupted, shutting down...")
+    finally:
+        # Restore the default Ctrl+C handling so a hanging shutdown can still be interrupted.
+        if sigint_handled:
+            loop.remove_signal_handler(signal.SIGINT)
+
+    # Stop the manager's monitoring tasks after routines complete.
+    await manager.stop()
+    await manager_task
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    logging.basicConfig(level=logging.INFO)
+    # Connects to the cached hub address if possible; otherwise scans for the hub.
+    # Runs on uvloop when it is installed (pip install pyLegoLLM[uvloop]) for lower
+    # per-callback overhead on BLE notifications.
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(run_app(hub_routine))
+    else:
+        uvloop.run(run_app(hub_routine))